@@ -1,284 +1,439 @@
-from flask import Flask, jsonify
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+
+import orjson
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import JSONProvider
 
 from config import DevConfig  # you can switch to ProdConfig in production
-from db import get_connection
+from db import pooled_connection
+from books import repository as books_repository
 from books.routes import bp as books_bp
 
 
-def create_app(config_class=DevConfig) -> Flask:
-    """
-    Application factory.
+# How long (seconds) a database probe result stays valid before /health
+# actually touches the database again. Keeps LB/monitoring scrapes from
+# turning into one SELECT per request: at most one probe per TTL window
+# runs across all concurrent requests.
+_HEALTH_TTL = 5.0
+_health_lock = threading.Lock()
+_health_checked_at = 0.0  # monotonic timestamp of the last probe
+_health_db_ok = False  # cached result of that probe
 
-    Creates and configures the Flask app instance.
-    """
-    app = Flask(__name__)
-    app.config.from_object(config_class)
 
-    # Register blueprints
-    app.register_blueprint(books_bp, url_prefix="/books")
+def _build_swagger_spec() -> dict:
+    """
+    Build the OpenAPI 3.0 spec dict.
 
-    # Health endpoint
-    @app.get("/health")
-    def health():
-        try:
-            with get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1")
-                    cur.fetchone()
-            db_status = "ok"
-        except Exception:
-            db_status = "error"
-
-        return jsonify({"status": "ok", "database": db_status})
-
-    # Swagger/OpenAPI spec
-    @app.get("/swagger.json")
-    def swagger_spec():
-        spec = {
-            "openapi": "3.0.0",
-            "info": {
-                "title": "Books API",
-                "version": "1.0.0",
-                "description": "Simple Books API example with Flask",
+    Called exactly once, from the first /swagger.json request; the
+    serialized result is cached so the spec is never rebuilt or
+    re-encoded after that.
+    """
+    return {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "Books API",
+            "version": "1.0.0",
+            "description": "Simple Books API example with Flask",
+        },
+        "paths": {
+            "/health": {
+                "get": {
+                    "summary": "Health check",
+                    "responses": {
+                        "200": {
+                            "description": "Health status",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "object",
+                                        "properties": {
+                                            "status": {"type": "string"},
+                                            "database": {"type": "string"},
+                                        },
+                                    }
+                                }
+                            },
+                        }
+                    },
+                }
             },
-            "paths": {
-                "/health": {
-                    "get": {
-                        "summary": "Health check",
-                        "responses": {
-                            "200": {
-                                "description": "Health status",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "type": "object",
-                                            "properties": {
-                                                "status": {"type": "string"},
-                                                "database": {"type": "string"},
-                                            },
-                                        }
+            "/books/": {
+                "get": {
+                    "summary": "List all books",
+                    "responses": {
+                        "200": {
+                            "description": "List of books",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "array",
+                                        "items": {
+                                            "$ref": "#/components/schemas/Book"
+                                        },
                                     }
-                                },
-                            }
-                        },
-                    }
+                                }
+                            },
+                        }
+                    },
                 },
-                "/books/": {
-                    "get": {
-                        "summary": "List all books",
-                        "responses": {
-                            "200": {
-                                "description": "List of books",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "type": "array",
-                                            "items": {
-                                                "$ref": "#/components/schemas/Book"
-                                            },
-                                        }
-                                    }
-                                },
+                "post": {
+                    "summary": "Create a new book",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/BookCreate"
+                                }
                             }
                         },
                     },
-                    "post": {
-                        "summary": "Create a new book",
-                        "requestBody": {
-                            "required": True,
+                    "responses": {
+                        "201": {
+                            "description": "Created book",
                             "content": {
                                 "application/json": {
                                     "schema": {
-                                        "$ref": "#/components/schemas/BookCreate"
+                                        "$ref": "#/components/schemas/Book"
                                     }
                                 }
                             },
                         },
-                        "responses": {
-                            "201": {
-                                "description": "Created book",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "$ref": "#/components/schemas/Book"
-                                        }
-                                    }
-                                },
-                            },
-                            "400": {"description": "Validation error"},
-                        },
+                        "400": {"$ref": "#/components/responses/ValidationError"},
                     },
                 },
-                "/books/{id}": {
-                    "get": {
-                        "summary": "Get a book by ID",
-                        "parameters": [
-                            {
-                                "name": "id",
-                                "in": "path",
-                                "required": True,
-                                "schema": {"type": "integer"},
+            },
+            "/books/bulk": {
+                "post": {
+                    "summary": "Create several books in one request",
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {
+                                        "$ref": "#/components/schemas/BookCreate"
+                                    },
+                                }
                             }
-                        ],
-                        "responses": {
-                            "200": {
-                                "description": "Book found",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
+                        },
+                    },
+                    "responses": {
+                        "201": {
+                            "description": "Created books",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "array",
+                                        "items": {
                                             "$ref": "#/components/schemas/Book"
-                                        }
+                                        },
                                     }
-                                },
+                                }
                             },
-                            "404": {"description": "Book not found"},
                         },
+                        "400": {"$ref": "#/components/responses/ValidationError"},
                     },
-                    "put": {
-                        "summary": "Replace a book",
-                        "parameters": [
-                            {
-                                "name": "id",
-                                "in": "path",
-                                "required": True,
-                                "schema": {"type": "integer"},
-                            }
-                        ],
-                        "requestBody": {
+                }
+            },
+            "/books/{id}": {
+                "get": {
+                    "summary": "Get a book by ID",
+                    "parameters": [
+                        {
+                            "name": "id",
+                            "in": "path",
                             "required": True,
+                            "schema": {"type": "integer"},
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Book found",
                             "content": {
                                 "application/json": {
                                     "schema": {
-                                        "$ref": "#/components/schemas/BookCreate"
+                                        "$ref": "#/components/schemas/Book"
                                     }
                                 }
                             },
                         },
-                        "responses": {
-                            "200": {
-                                "description": "Updated book",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "$ref": "#/components/schemas/Book"
-                                        }
-                                    }
-                                },
-                            },
-                            "404": {"description": "Book not found"},
-                        },
+                        "404": {"$ref": "#/components/responses/NotFound"},
                     },
-                    "patch": {
-                        "summary": "Partially update a book",
-                        "parameters": [
-                            {
-                                "name": "id",
-                                "in": "path",
-                                "required": True,
-                                "schema": {"type": "integer"},
-                            }
-                        ],
-                        "requestBody": {
+                },
+                "put": {
+                    "summary": "Replace a book",
+                    "parameters": [
+                        {
+                            "name": "id",
+                            "in": "path",
                             "required": True,
+                            "schema": {"type": "integer"},
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "$ref": "#/components/schemas/BookCreate"
+                                }
+                            }
+                        },
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Updated book",
                             "content": {
                                 "application/json": {
                                     "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "title": {"type": "string"},
-                                            "author": {"type": "string"},
-                                            "year": {"type": "integer"},
-                                            "isbn": {"type": "string"},
-                                        },
+                                        "$ref": "#/components/schemas/Book"
                                     }
                                 }
                             },
                         },
-                        "responses": {
-                            "200": {
-                                "description": "Updated book",
-                                "content": {
-                                    "application/json": {
-                                        "schema": {
-                                            "$ref": "#/components/schemas/Book"
-                                        }
+                        "404": {"$ref": "#/components/responses/NotFound"},
+                    },
+                },
+                "patch": {
+                    "summary": "Partially update a book",
+                    "parameters": [
+                        {
+                            "name": "id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "integer"},
+                        }
+                    ],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "title": {"type": "string"},
+                                        "author": {"type": "string"},
+                                        "year": {"type": "integer"},
+                                        "isbn": {"type": "string"},
+                                    },
+                                }
+                            }
+                        },
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Updated book",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "$ref": "#/components/schemas/Book"
                                     }
-                                },
+                                }
                             },
-                            "404": {"description": "Book not found"},
                         },
+                        "404": {"$ref": "#/components/responses/NotFound"},
                     },
-                    "delete": {
-                        "summary": "Delete a book",
-                        "parameters": [
-                            {
-                                "name": "id",
-                                "in": "path",
-                                "required": True,
-                                "schema": {"type": "integer"},
-                            }
-                        ],
-                        "responses": {
-                            "204": {"description": "Book deleted"},
-                            "404": {"description": "Book not found"},
-                        },
+                },
+                "delete": {
+                    "summary": "Delete a book",
+                    "parameters": [
+                        {
+                            "name": "id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "integer"},
+                        }
+                    ],
+                    "responses": {
+                        "204": {"description": "Book deleted"},
+                        "404": {"$ref": "#/components/responses/NotFound"},
                     },
                 },
             },
-            "components": {
-                "schemas": {
-                    "Book": {
-                        "type": "object",
-                        "properties": {
-                            "id": {"type": "integer"},
-                            "title": {"type": "string"},
-                            "author": {"type": "string"},
-                            "year": {"type": "integer"},
-                            "isbn": {"type": "string"},
-                        },
-                        "required": ["id", "title", "author", "year", "isbn"],
+        },
+        "components": {
+            "responses": {
+                "NotFound": {"description": "Book not found"},
+                "ValidationError": {"description": "Validation error"},
+            },
+            "schemas": {
+                "Book": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "title": {"type": "string"},
+                        "author": {"type": "string"},
+                        "year": {"type": "integer"},
+                        "isbn": {"type": "string"},
                     },
-                    "BookCreate": {
-                        "type": "object",
-                        "properties": {
-                            "title": {"type": "string"},
-                            "author": {"type": "string"},
-                            "year": {"type": "integer"},
-                            "isbn": {"type": "string"},
-                        },
-                        "required": ["title", "author", "year", "isbn"],
+                    "required": ["id", "title", "author", "year", "isbn"],
+                },
+                "BookCreate": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "author": {"type": "string"},
+                        "year": {"type": "integer"},
+                        "isbn": {"type": "string"},
                     },
-                }
+                    "required": ["title", "author", "year", "isbn"],
+                },
+            }
+        },
+    }
+
+
+# The spec is static, so it is serialized exactly once -- lazily, on the
+# first /swagger.json request, so deployments that never serve docs pay
+# nothing at startup. Conditional-request metadata is computed alongside:
+# a weak ETag over the bytes, and a Last-Modified pinned to build time
+# (the spec cannot change without a restart).
+_spec_lock = threading.Lock()
+_spec_cache = None  # (bytes, md5, etag, built_at, last_modified)
+
+
+def _get_spec():
+    global _spec_cache
+    if _spec_cache is None:
+        with _spec_lock:
+            if _spec_cache is None:
+                spec_bytes = json.dumps(
+                    _build_swagger_spec(), separators=(",", ":")
+                ).encode("utf-8")
+                md5 = hashlib.md5(spec_bytes).hexdigest()
+                built_at = datetime.now(timezone.utc).replace(microsecond=0)
+                _spec_cache = (
+                    spec_bytes,
+                    md5,
+                    f'W/"{md5}"',
+                    built_at,
+                    formatdate(built_at.timestamp(), usegmt=True),
+                )
+    return _spec_cache
+
+# Swagger UI page is equally static: pre-encode it once and serve the bytes.
+_DOCS_HTML = b"""<!DOCTYPE html>
+<html>
+<head>
+  <title>Books API - Swagger UI</title>
+  <link rel="stylesheet" type="text/css"
+        href="https://unpkg.com/swagger-ui-dist@5/swagger-ui.css" />
+</head>
+<body>
+  <div id="swagger-ui"></div>
+  <script src="https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js"></script>
+  <script>
+    window.onload = function() {
+      SwaggerUIBundle({
+        url: '/swagger.json',
+        dom_id: '#swagger-ui'
+      });
+    };
+  </script>
+</body>
+</html>
+"""
+_DOCS_ETAG = hashlib.md5(_DOCS_HTML).hexdigest()
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson's C encoder/decoder.
+
+    Routes jsonify() and request.get_json() through orjson, which is
+    considerably faster than the stdlib encoder on list/dict payloads.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def create_app(config_class=DevConfig) -> Flask:
+    """
+    Application factory.
+
+    Creates and configures the Flask app instance.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
+
+    # Register blueprints
+    app.register_blueprint(books_bp, url_prefix="/books")
+
+    # Return the scoped database session to its registry when the app
+    # context tears down, so the next request starts with a clean session.
+    @app.teardown_appcontext
+    def remove_db_session(exc):
+        books_repository.SessionLocal.remove()
+
+    # Health endpoint
+    @app.get("/health")
+    def health():
+        global _health_checked_at, _health_db_ok
+
+        if time.monotonic() - _health_checked_at >= _HEALTH_TTL:
+            with _health_lock:
+                # Re-check under the lock: another request may have just
+                # probed while this one was waiting.
+                if time.monotonic() - _health_checked_at >= _HEALTH_TTL:
+                    try:
+                        with pooled_connection() as conn:
+                            with conn.cursor() as cur:
+                                cur.execute("SELECT 1")
+                                cur.fetchone()
+                        _health_db_ok = True
+                    except Exception:
+                        _health_db_ok = False
+                    _health_checked_at = time.monotonic()
+
+        return jsonify(
+            {"status": "ok", "database": "ok" if _health_db_ok else "error"}
+        )
+
+    # Swagger/OpenAPI spec (serialized once, on first request)
+    @app.get("/swagger.json")
+    def swagger_spec():
+        spec_bytes, md5, etag, built_at, last_modified = _get_spec()
+        unmodified = request.if_none_match.contains_weak(md5) or (
+            request.if_modified_since is not None
+            and request.if_modified_since >= built_at
+        )
+        if unmodified:
+            return Response(status=304)
+        return Response(
+            spec_bytes,
+            mimetype="application/json",
+            headers={
+                "Cache-Control": "public, max-age=86400, must-revalidate",
+                "ETag": etag,
+                "Last-Modified": last_modified,
             },
-        }
-        return jsonify(spec)
+        )
 
-    # Simple Swagger UI using CDN
+    # Simple Swagger UI using CDN (pre-encoded at import time)
     @app.get("/docs")
     def docs():
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-          <title>Books API - Swagger UI</title>
-          <link rel="stylesheet" type="text/css"
-                href="https://unpkg.com/swagger-ui-dist@5/swagger-ui.css" />
-        </head>
-        <body>
-          <div id="swagger-ui"></div>
-          <script src="https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js"></script>
-          <script>
-            window.onload = function() {
-              SwaggerUIBundle({
-                url: '/swagger.json',
-                dom_id: '#swagger-ui'
-              });
-            };
-          </script>
-        </body>
-        </html>
-        """
-        return html
+        if request.headers.get("If-None-Match") == _DOCS_ETAG:
+            return Response(status=304)
+        return Response(
+            _DOCS_HTML,
+            mimetype="text/html",
+            headers={
+                "Cache-Control": "public, max-age=86400",
+                "ETag": _DOCS_ETAG,
+            },
+        )
 
     # Error handlers
     @app.errorhandler(400)
@@ -328,5 +483,12 @@ app = create_app()
 
 
 if __name__ == "__main__":
-    # For development only. In production, use a proper WSGI server (e.g., gunicorn).
-    app.run(host="0.0.0.0", port=5000, debug=app.config.get("DEBUG", False))
\ No newline at end of file
+    # For development only. In production, use a proper WSGI server (e.g.,
+    # gunicorn with multiple threads/workers). threaded=True lets the dev
+    # server overlap requests that are blocked on database I/O.
+    app.run(
+        host="0.0.0.0",
+        port=5000,
+        debug=app.config.get("DEBUG", False),
+        threaded=True,
+    )
@@ -1,7 +1,9 @@
+from functools import lru_cache
+from operator import attrgetter
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 from sqlalchemy import create_engine
 
 from config import BaseConfig
@@ -11,101 +13,263 @@ from books.models import Book
 # SQLAlchemy engine / session
 # ---------------------------------------------------------------------------
 
-# Single engine with connection pool, shared by the repository
-engine = create_engine(
-    BaseConfig.SQLALCHEMY_DATABASE_URI,
-    future=True,
-)
+# Single engine with connection pool, shared by the repository and built
+# lazily on first use so importing this module has no side effects and
+# test runners can adjust configuration (or call get_engine.cache_clear())
+# before any connection exists.
+# The pool is sized explicitly so concurrent workers do not serialize on
+# connection acquisition, recycled before typical server-side timeouts,
+# and pre-pinged so stale connections are replaced transparently.
+@lru_cache(maxsize=1)
+def get_engine():
+    return create_engine(
+        BaseConfig.SQLALCHEMY_DATABASE_URI,
+        future=True,
+        pool_size=BaseConfig.DB_POOL_SIZE,
+        max_overflow=BaseConfig.DB_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        echo=BaseConfig.DB_ECHO,
+        # Route bulk DML through psycopg2's fast executemany helpers:
+        # INSERTs use multi-row VALUES batching (insertmanyvalues), and
+        # other executemany statements fall back to execute_batch paging.
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=500,
+    )
+
 
-SessionLocal = sessionmaker(
-    bind=engine,
+_sessionmaker = sessionmaker(
     autoflush=False,
     autocommit=False,
     future=True,
 )
 
 
+def _session_factory() -> Session:
+    # Bind at session-creation time so the engine is only built when the
+    # first database work actually happens.
+    return _sessionmaker(bind=get_engine())
+
+
+# Thread-scoped session registry: each worker thread reuses one Session
+# (and its pooled connection) across repository calls within a request.
+# create_app registers SessionLocal.remove() on app-context teardown.
+SessionLocal = scoped_session(_session_factory)
+
+
+# Columns exposed by the API, matching _book_to_dict's shape.
+_BOOK_COLS = (Book.id, Book.title, Book.author, Book.year, Book.isbn, Book.status)
+
+# Hot statements are built once at import time. SQLAlchemy caches the
+# compiled SQL per statement object, so reusing these avoids re-building
+# and re-compiling the same SELECT on every call -- the closest analogue
+# of a server-side prepared statement available through psycopg2.
+# The listing selects plain columns (Core) rather than Book entities, so
+# rows skip identity-map insertion and ORM instance construction.
+_LIST_BOOKS_STMT = select(*_BOOK_COLS).order_by(Book.id)
+
+# The PATCH path accepts any non-empty subset of these four fields, i.e.
+# only 15 possible statement shapes. Instead of pre-building all 15 at
+# import, build each UPDATE ... RETURNING statement the first time its
+# field-set shows up and memoize it; shapes a deployment never PATCHes
+# cost nothing, and repeat shapes are a cache hit.
+_PATCH_FIELDS = ("author", "isbn", "title", "year")
+
+
+@lru_cache(maxsize=32)
+def _patch_stmt(keys):
+    # keys is a sorted tuple of field names, so equal field-sets always
+    # map to the same cache entry regardless of payload key order.
+    return (
+        update(Book)
+        .where(Book.id == bindparam("b_id"))
+        .values({field: bindparam(field) for field in keys})
+        .returning(*_BOOK_COLS)
+    )
+
+
+# A PUT is the all-fields shape of the same statement family.
+_REPLACE_STMT = _patch_stmt(_PATCH_FIELDS)
+
+_COUNT_STMT = select(func.count()).select_from(Book)
+
+# Batched point lookup: the expanding bindparam renders one IN clause
+# sized to the id list at execution time, so any batch shares this single
+# statement object (and its compiled-SQL cache entry).
+_BOOKS_BY_IDS_STMT = select(*_BOOK_COLS).where(
+    Book.id.in_(bindparam("ids", expanding=True))
+)
+
+_DELETE_STMT = delete(Book).where(Book.id == bindparam("b_id")).returning(Book.id)
+
+_INSERT_STMT = insert(Book).returning(*_BOOK_COLS)
+
+
+_BOOK_FIELDS = ("id", "title", "author", "year", "isbn", "status")
+_BOOK_GETTER = attrgetter(*_BOOK_FIELDS)
+
+
 def _book_to_dict(book: Book) -> Dict[str, Any]:
-    return {
-        "id": book.id,
-        "title": book.title,
-        "author": book.author,
-        "year": book.year,
-        "isbn": book.isbn,
-        "status": book.status,
-    }
+    # attrgetter fetches all six attributes in one C-level call, so the
+    # conversion pays a single descriptor walk instead of six interpreted
+    # attribute lookups per row.
+    return dict(zip(_BOOK_FIELDS, _BOOK_GETTER(book)))
 
 
 # ---------------------------------------------------------------------------
 # Repository functions using ORM
 # ---------------------------------------------------------------------------
 
-def list_books() -> List[Dict[str, Any]]:
-    with SessionLocal() as session:
-        stmt = select(Book).order_by(Book.id)
-        books = session.scalars(stmt).all()
-        return [_book_to_dict(b) for b in books]
+def list_books(
+    after: Optional[int] = None, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    List books ordered by id.
+
+    With `after`/`limit` the listing is keyset-paginated: rows with
+    id > after, at most `limit` of them. The PK index serves the scan
+    directly, so work per page stays flat as the table grows.
+    """
+    stmt = _LIST_BOOKS_STMT
+    if after is not None:
+        stmt = stmt.where(Book.id > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    session = SessionLocal()
+    try:
+        # Iterate the result directly; .all() would materialize an extra
+        # intermediate list before the dict conversion.
+        return [dict(r._mapping) for r in session.execute(stmt)]
+    finally:
+        # End the read transaction (releasing its locks and connection)
+        # while keeping the session itself alive for the next call.
+        session.rollback()
+
+
+def count_books() -> int:
+    """Total number of books, via a bare COUNT(*) the PK index satisfies."""
+    session = SessionLocal()
+    try:
+        return session.execute(_COUNT_STMT).scalar_one()
+    finally:
+        session.rollback()
+
+
+def get_books_by_ids(ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Fetch several books in one SELECT ... WHERE id IN (...) round trip.
+
+    Results come back in the requested id order; ids with no matching row
+    are silently dropped. This replaces the N point lookups a client would
+    otherwise issue one request at a time.
+    """
+    session = SessionLocal()
+    try:
+        rows = session.execute(_BOOKS_BY_IDS_STMT, {"ids": ids})
+        by_id = {r.id: dict(r._mapping) for r in rows}
+        return [by_id[i] for i in ids if i in by_id]
+    finally:
+        session.rollback()
 
 
 def get_book(book_id: int) -> Optional[Dict[str, Any]]:
-    with SessionLocal() as session:
+    session = SessionLocal()
+    try:
         book = session.get(Book, book_id)
         return _book_to_dict(book) if book else None
+    finally:
+        session.rollback()
 
 
 def create_book(data: Dict[str, Any]) -> Dict[str, Any]:
-    with SessionLocal() as session:
-        book = Book(
-            title=data["title"],
-            author=data["author"],
-            year=data["year"],
-            isbn=data["isbn"],
-        )
-        session.add(book)
+    session = SessionLocal()
+    try:
+        # INSERT ... RETURNING brings back id and server defaults in the
+        # same round trip, so no post-commit refresh SELECT is needed.
+        row = session.execute(
+            _INSERT_STMT,
+            {
+                "title": data["title"],
+                "author": data["author"],
+                "year": data["year"],
+                "isbn": data["isbn"],
+            },
+        ).one()
         session.commit()
-        session.refresh(book)  # garante que id e demais campos estejam populados
-        return _book_to_dict(book)
+        return dict(row._mapping)
+    finally:
+        session.rollback()
+
+
+def create_books(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert many books in a single transaction.
+
+    SQLAlchemy's insertmanyvalues support batches the whole list into
+    multi-row INSERT ... RETURNING statements, so an import of N books
+    costs a handful of round trips instead of N.
+    """
+    session = SessionLocal()
+    try:
+        rows = session.execute(
+            _INSERT_STMT,
+            [
+                {
+                    "title": item["title"],
+                    "author": item["author"],
+                    "year": item["year"],
+                    "isbn": item["isbn"],
+                }
+                for item in items
+            ],
+        ).all()
+        session.commit()
+        return [dict(r._mapping) for r in rows]
+    finally:
+        session.rollback()
 
 
 def replace_book(book_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    with SessionLocal() as session:
-        book = session.get(Book, book_id)
-        if book is None:
+    session = SessionLocal()
+    try:
+        row = session.execute(_REPLACE_STMT, {"b_id": book_id, **data}).first()
+        if row is None:
             return None
 
-        book.title = data["title"]
-        book.author = data["author"]
-        book.year = data["year"]
-        book.isbn = data["isbn"]
-
         session.commit()
-        session.refresh(book)
-        return _book_to_dict(book)
+        return dict(row._mapping)
+    finally:
+        session.rollback()
 
 
 def update_book(book_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if not fields:
         return None
 
-    with SessionLocal() as session:
-        book = session.get(Book, book_id)
-        if book is None:
+    stmt = _patch_stmt(tuple(sorted(fields)))
+    session = SessionLocal()
+    try:
+        row = session.execute(stmt, {"b_id": book_id, **fields}).first()
+        if row is None:
             return None
 
-        for key, value in fields.items():
-            setattr(book, key, value)
-
         session.commit()
-        session.refresh(book)
-        return _book_to_dict(book)
+        return dict(row._mapping)
+    finally:
+        session.rollback()
 
 
 def delete_book(book_id: int) -> bool:
-    with SessionLocal() as session:
-        book = session.get(Book, book_id)
-        if book is None:
+    session = SessionLocal()
+    try:
+        row = session.execute(_DELETE_STMT, {"b_id": book_id}).first()
+        if row is None:
             return False
 
-        session.delete(book)
         session.commit()
-        return True
\ No newline at end of file
+        return True
+    finally:
+        session.rollback()
\ No newline at end of file
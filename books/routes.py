@@ -1,82 +1,245 @@
-from typing import Any, Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
-from flask import Blueprint, jsonify, request, abort
+import orjson
+from flask import Blueprint, Response, g, jsonify, request, abort, url_for
 
 from . import repository
 
 
 bp = Blueprint("books", __name__)
 
-ALLOWED_FIELDS = {"title", "author", "year", "isbn"}
+# Bind the orjson entry points once at import; per-request calls then hit a
+# module global instead of re-resolving the attribute on the orjson module.
+_loads = orjson.loads
+_dumps = orjson.dumps
 
+# Bounded in-process cache of serialized GET /books/<id> responses.
+# Maps id -> (etag, body bytes); every mutation of a book evicts its entry,
+# so read hits skip both the database round trip and re-serialization.
+_BOOK_CACHE_MAX = 1024
+_book_cache: "OrderedDict[int, Tuple[str, bytes]]" = OrderedDict()
+_book_cache_lock = threading.Lock()
 
-def _require_json_object() -> Dict[str, Any]:
-    if not request.is_json:
+
+def _book_cache_get(book_id: int) -> Optional[Tuple[str, bytes]]:
+    with _book_cache_lock:
+        entry = _book_cache.get(book_id)
+        if entry is not None:
+            _book_cache.move_to_end(book_id)
+        return entry
+
+
+def _book_cache_put(book_id: int, entry: Tuple[str, bytes]) -> None:
+    with _book_cache_lock:
+        _book_cache[book_id] = entry
+        _book_cache.move_to_end(book_id)
+        if len(_book_cache) > _BOOK_CACHE_MAX:
+            _book_cache.popitem(last=False)
+
+
+def _book_cache_evict(book_id: int) -> None:
+    with _book_cache_lock:
+        _book_cache.pop(book_id, None)
+
+ALLOWED_FIELDS = frozenset({"title", "author", "year", "isbn"})
+
+# Sorted once at import; only needed to build the "missing fields" message.
+_REQUIRED_SORTED = tuple(sorted(ALLOWED_FIELDS))
+
+# Expected type and error wording per field, checked in a single pass.
+_FIELD_TYPES = {
+    "title": (str, "a string"),
+    "author": (str, "a string"),
+    "year": (int, "an integer"),
+    "isbn": (str, "a string"),
+}
+
+# One bit per field so the validators can track which required fields
+# they have seen without allocating any intermediate sets.
+_FIELD_BITS = {"title": 1, "author": 2, "year": 4, "isbn": 8}
+_REQUIRED_MASK = 0b1111
+
+
+# Methods whose body is parsed once up front by _parse_json_body.
+_JSON_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+@bp.before_request
+def _parse_json_body():
+    """
+    Parse write-request bodies exactly once per request with orjson.
+
+    The decoded payload lands in g.json_body, so individual handlers skip
+    the per-call header inspection and stdlib JSON parsing that
+    request.get_json() would redo.
+    """
+    if request.method not in _JSON_METHODS:
+        return
+    if request.mimetype != "application/json":
         abort(415, description="Content-Type must be application/json")
-    data = request.get_json(silent=True)
+    try:
+        g.json_body = _loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        abort(400, description="Request body must be a JSON object")
+
+
+def _require_json_object() -> Dict[str, Any]:
+    data = g.json_body
     if not isinstance(data, dict):
         abort(400, description="Request body must be a JSON object")
     return data
 
 
-def _validate_fields(data: Dict[str, Any], required: bool) -> Dict[str, Any]:
-    unknown = set(data.keys()) - ALLOWED_FIELDS
-    if unknown:
-        abort(400, description=f"Unknown field(s): {sorted(unknown)}")
+def _compile_validator(required: bool):
+    """
+    Build a payload validator with the `required` mode baked in.
 
-    if required:
-        missing = [f for f in sorted(ALLOWED_FIELDS) if f not in data]
-        if missing:
+    Both validators are compiled once at import -- the same
+    compile-the-schema-once idea jsonschema libraries use -- so the
+    per-request call carries no mode dispatch.
+    """
+
+    def validate(data: Dict[str, Any]) -> Dict[str, Any]:
+        # Single pass: key membership, type check and required-field
+        # tracking per item, with a bitmask instead of set arithmetic.
+        seen = 0
+        for key, value in data.items():
+            bit = _FIELD_BITS.get(key)
+            if bit is None:
+                unknown = [k for k in data if k not in _FIELD_BITS]
+                abort(400, description=f"Unknown field(s): {sorted(unknown)}")
+            seen |= bit
+            expected, label = _FIELD_TYPES[key]
+            if not isinstance(value, expected):
+                abort(400, description=f"Field '{key}' must be {label}")
+
+        if required and seen != _REQUIRED_MASK:
+            missing = [f for f in _REQUIRED_SORTED if f not in data]
             abort(400, description=f"Missing required field(s): {missing}")
 
-    # Basic type checks
-    if "year" in data and not isinstance(data["year"], int):
-        abort(400, description="Field 'year' must be an integer")
-    for s in ("title", "author", "isbn"):
-        if s in data and not isinstance(data[s], str):
-            abort(400, description=f"Field '{s}' must be a string")
+        return data
 
-    return data
+    return validate
+
+
+_validate_create = _compile_validator(required=True)
+_validate_patch = _compile_validator(required=False)
+
+
+# Hard cap on ?limit= so a single page can never pull the whole table.
+_MAX_PAGE_SIZE = 100
+
+# Hard cap on ?ids= so a single batch lookup stays a bounded IN clause.
+_MAX_BATCH_IDS = 500
 
 
 @bp.get("/")
 def list_books():
-    books = repository.list_books()
-    return jsonify(books)
+    if request.method == "HEAD":
+        # Count-only probe: answer with X-Total-Count from a bare
+        # COUNT(*) and skip fetching and serializing any rows.
+        return Response(headers={"X-Total-Count": str(repository.count_books())})
+
+    ids_raw = request.args.get("ids")
+    if ids_raw is not None:
+        # Batched point lookup: one IN query instead of N GET /books/<id>
+        # round trips. Takes precedence over pagination params.
+        try:
+            ids = [int(part) for part in ids_raw.split(",")]
+        except ValueError:
+            abort(
+                400,
+                description="Query param 'ids' must be comma-separated integers",
+            )
+        if not ids or len(ids) > _MAX_BATCH_IDS:
+            abort(
+                400,
+                description=f"Query param 'ids' must list 1..{_MAX_BATCH_IDS} ids",
+            )
+        return jsonify(repository.get_books_by_ids(ids))
+
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        if limit < 1:
+            abort(400, description="Query param 'limit' must be a positive integer")
+        limit = min(limit, _MAX_PAGE_SIZE)
+
+    books = repository.list_books(after=after, limit=limit)
+    resp = jsonify(books)
+    if after is None and limit is None:
+        # The unpaginated listing is the whole table, so its length is
+        # the total; paginated pages omit the header rather than report
+        # a page-sized "total".
+        resp.headers["X-Total-Count"] = str(len(books))
+    if limit is not None and len(books) == limit:
+        next_url = url_for("books.list_books", after=books[-1]["id"], limit=limit)
+        resp.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    # Tag the body so unchanged listings revalidate with a bodyless 304.
+    resp.set_etag(hashlib.md5(resp.get_data()).hexdigest())
+    return resp.make_conditional(request)
 
 
 @bp.get("/<int:book_id>")
 def get_book(book_id: int):
-    book = repository.get_book(book_id)
-    if not book:
-        abort(404, description="Book not found")
-    return jsonify(book)
+    cached = _book_cache_get(book_id)
+    if cached is None:
+        book = repository.get_book(book_id)
+        if not book:
+            abort(404, description="Book not found")
+        body = _dumps(book)
+        cached = (hashlib.md5(body).hexdigest(), body)
+        _book_cache_put(book_id, cached)
+
+    etag, body = cached
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304)
+    return Response(body, mimetype="application/json", headers={"ETag": etag})
 
 
 @bp.post("/")
 def create_book():
     data = _require_json_object()
-    data = _validate_fields(data, required=True)
+    data = _validate_create(data)
 
     book = repository.create_book(data)
     return jsonify(book), 201
 
 
+@bp.post("/bulk")
+def create_books_bulk():
+    data = g.json_body
+    if not isinstance(data, list) or not data:
+        abort(400, description="Request body must be a non-empty JSON array")
+    for item in data:
+        if not isinstance(item, dict):
+            abort(400, description="Request body must be a JSON array of objects")
+        _validate_create(item)
+
+    books = repository.create_books(data)
+    return jsonify(books), 201
+
+
 @bp.put("/<int:book_id>")
 def replace_book(book_id: int):
     data = _require_json_object()
-    data = _validate_fields(data, required=True)
+    data = _validate_create(data)
 
     book = repository.replace_book(book_id, data)
     if not book:
         abort(404, description="Book not found")
+    _book_cache_evict(book_id)
     return jsonify(book)
 
 
 @bp.patch("/<int:book_id>")
 def update_book(book_id: int):
     data = _require_json_object()
-    data = _validate_fields(data, required=False)
+    data = _validate_patch(data)
 
     if not data:
         abort(400, description="No fields to update")
@@ -84,6 +247,7 @@ def update_book(book_id: int):
     book = repository.update_book(book_id, data)
     if not book:
         abort(404, description="Book not found")
+    _book_cache_evict(book_id)
     return jsonify(book)
 
 
@@ -92,4 +256,5 @@ def delete_book(book_id: int):
     deleted = repository.delete_book(book_id)
     if not deleted:
         abort(404, description="Book not found")
+    _book_cache_evict(book_id)
     return "", 204
\ No newline at end of file
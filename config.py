@@ -14,6 +14,18 @@ class BaseConfig:
     DB_NAME = os.getenv("APP_DB_NAME", "app_db")
     DB_USER = os.getenv("APP_DB_USER", "app_user")
     DB_PASSWORD = os.getenv("APP_DB_PASSWORD", "bsd0030")
+
+    # Connection pool bounds (db.pooled_connection)
+    DB_POOL_MIN = int(os.getenv("APP_DB_POOL_MIN", "2"))
+    DB_POOL_MAX = int(os.getenv("APP_DB_POOL_MAX", "20"))
+
+    # SQLAlchemy engine pool (books.repository)
+    DB_POOL_SIZE = int(os.getenv("APP_DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("APP_DB_MAX_OVERFLOW", "20"))
+
+    # Log every SQL statement the engine emits (dev/test diagnosis of
+    # chatty request paths, e.g. accidental N+1 query patterns).
+    DB_ECHO = os.getenv("APP_DB_ECHO", "0") == "1"
     SQLALCHEMY_DATABASE_URI = (
         f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
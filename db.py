@@ -1,8 +1,28 @@
+import threading
+from contextlib import contextmanager
+
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from flask import current_app
 
 
+# Shared connection pool, created lazily on first use (inside an app context).
+_pool = None
+_pool_lock = threading.Lock()
+
+# TCP keepalive settings passed to every connection: probe idle sockets
+# after 30s so connections silently dropped by firewalls/NAT are detected
+# and replaced instead of hanging a request on a dead socket. (libpq
+# already sets TCP_NODELAY on its sockets.)
+_KEEPALIVE_KWARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+}
+
+
 def get_connection():
     """
     Open a new PostgreSQL connection using configuration from Flask app.
@@ -16,9 +36,75 @@ def get_connection():
         dbname=cfg["DB_NAME"],
         user=cfg["DB_USER"],
         password=cfg["DB_PASSWORD"],
+        **_KEEPALIVE_KWARGS,
     )
     return conn
 
 
-# Helper alias for row factory
-RealDictCursor = psycopg2.extras.RealDictCursor
\ No newline at end of file
+def _get_pool():
+    """
+    Return the shared ThreadedConnectionPool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                cfg = current_app.config
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=cfg["DB_POOL_MIN"],
+                    maxconn=cfg["DB_POOL_MAX"],
+                    host=cfg["DB_HOST"],
+                    port=cfg["DB_PORT"],
+                    dbname=cfg["DB_NAME"],
+                    user=cfg["DB_USER"],
+                    password=cfg["DB_PASSWORD"],
+                    **_KEEPALIVE_KWARGS,
+                )
+    return _pool
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a connection from the shared pool and return it when done.
+
+    Unlike get_connection(), this avoids the TCP + auth handshake on every
+    call; the pool hands back an already-established connection.
+
+    Connections are handed out in autocommit mode: callers issue single,
+    self-contained statements, so there is no implicit BEGIN to open nor a
+    COMMIT/ROLLBACK round trip to pay when the connection goes back.
+    """
+    pool = _get_pool()
+    conn = pool.getconn()
+    conn.autocommit = True
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def iter_books(conn, itersize: int = 1000):
+    """
+    Stream book rows as dicts through a server-side (named) cursor.
+
+    The named cursor keeps at most `itersize` rows buffered client-side,
+    so memory stays bounded however large the table grows. Rows come back
+    as RealDictCursor dicts, ready for JSON serialization (e.g. behind
+    flask.stream_with_context for an exports endpoint).
+    """
+    # Autocommit connections (e.g. from pooled_connection) have no open
+    # transaction, so the server-side cursor must be declared WITH HOLD.
+    cur = conn.cursor(
+        name="books_stream",
+        cursor_factory=psycopg2.extras.RealDictCursor,
+        withhold=conn.autocommit,
+    )
+    cur.itersize = itersize
+    try:
+        cur.execute(
+            "SELECT id, title, author, year, isbn, status FROM books ORDER BY id"
+        )
+        yield from cur
+    finally:
+        cur.close()
@@ -0,0 +1,40 @@
+"""books id covering index
+
+Revision ID: b7a41c9d2f05
+Revises: 3e30fa26a431
+Create Date: 2026-08-27 10:12:41.208467
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a41c9d2f05'
+down_revision: Union[str, Sequence[str], None] = '3e30fa26a431'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Covering index: the listing's SELECT ... ORDER BY id and id-range
+    # pagination read every API column from the index alone (index-only
+    # scan), skipping the heap fetch per row. The isbn lookup is already
+    # served by the unique constraint's index from the initial revision.
+    op.create_index(
+        'books_id_covering',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_include=['title', 'author', 'year', 'isbn', 'status'],
+    )
+    # Refresh planner statistics so the new index is considered right away.
+    op.execute('ANALYZE books')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('books_id_covering', table_name='books')
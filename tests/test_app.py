@@ -15,44 +15,50 @@ class BookApiTestCase(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """
-        Create a Flask app instance configured for tests
-        and a shared test client.
+        Create a Flask app instance configured for tests,
+        a shared test client, and one fixture connection for the class.
         """
         cls.app = create_app(TestConfig)
         cls.app_context = cls.app.app_context()
         cls.app_context.push()
         cls.client = cls.app.test_client()
+        # Reused by every setUp; reconnecting per test would redo the
+        # TCP + auth handshake once per test method.
+        cls.fixture_conn = get_connection()
 
     @classmethod
     def tearDownClass(cls):
         """
-        Clean up the application context after all tests.
+        Close the fixture connection and clean up the application context.
         """
+        cls.fixture_conn.close()
         cls.app_context.pop()
 
     def setUp(self):
         """
         Ensure a known state for the database before each test.
         """
-        with get_connection() as conn:
-            with conn.cursor() as cur:
-                # Clear table and reset ids (dev/test friendly)
-                cur.execute("TRUNCATE TABLE books RESTART IDENTITY CASCADE;")
-
-                # Insert two known records
-                cur.execute(
-                    """
-                    INSERT INTO books (title, author, year, isbn)
-                    VALUES
-                        (%s, %s, %s, %s),
-                        (%s, %s, %s, %s)
-                    """,
-                    (
-                        "Book 1", "Author 1", 2001, "111",
-                        "Book 2", "Author 2", 2002, "222",
-                    ),
-                )
-            conn.commit()
+        conn = self.fixture_conn
+        with conn.cursor() as cur:
+            # Clear the table (resetting ids) and insert the two known
+            # records in a single multi-statement round trip.
+            # SET LOCAL makes this transaction's commit skip the WAL fsync
+            # wait (test-only tuning; scoped to the fixture transaction).
+            cur.execute(
+                """
+                SET LOCAL synchronous_commit = off;
+                TRUNCATE TABLE books RESTART IDENTITY CASCADE;
+                INSERT INTO books (title, author, year, isbn)
+                VALUES
+                    (%s, %s, %s, %s),
+                    (%s, %s, %s, %s)
+                """,
+                (
+                    "Book 1", "Author 1", 2001, "111",
+                    "Book 2", "Author 2", 2002, "222",
+                ),
+            )
+        conn.commit()
 
     # ---------- GET /health ----------
     def test_health(self):